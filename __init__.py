@@ -1,4 +1,5 @@
 from .augmentation import DataAugmentation
 from .download import Downloader
 from .split import SplitData
-from .wavelet import Wavelet
\ No newline at end of file
+from .wavelet import Wavelet
+from .pipeline import run_pipeline
\ No newline at end of file
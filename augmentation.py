@@ -1,5 +1,6 @@
 import numpy as np
-from typing import Tuple
+import numexpr as ne
+from typing import Optional, Tuple
 
 
 class DataAugmentation:
@@ -10,13 +11,15 @@ class DataAugmentation:
         jitter:  https://arxiv.org/pdf/1706.00527.pdf
     """
     
-    def __init__(self, x:np.ndarray, y:np.ndarray, augmentation_factor:int):
+    def __init__(self, x:np.ndarray, y:np.ndarray, augmentation_factor:int,
+                 seed:Optional[int]=None):
         """Constructor de la clase
         
         Args:
             x (np.ndarray): EEG array de 3 dimensiones (epochs, channels, time)
             y (np.ndarray): labels array de 1 dimension (label)
             augmentation_factor (int): Cuantas veces se aumentaran los datos
+            seed (Optional[int], optional): Semilla del generador de numeros aleatorios. Defaults to None.
 
         Raises:
             ValueError: Si el EEG no son de 3 dimensiones
@@ -34,24 +37,39 @@ class DataAugmentation:
         
         self.augmentation_factor = augmentation_factor
         
-        self.eeg = x
+        self._rng = np.random.default_rng(seed)
         
-        self.labels = y
+        self.eeg = np.ascontiguousarray(x, dtype=np.float32)
+        
+        self.labels = np.asarray(y)
+        
+        self._target_suffix = np.char.add('__target_', self.labels.astype(str))
         
         self.current = x.shape[0]
         
         output_shape = ((self.augmentation_factor * x.shape[0]) + x.shape[0])
         
-        self.x_output_array = np.zeros(shape=(output_shape,
+        self.x_output_array = np.empty(shape=(output_shape,
                                               x.shape[1],
-                                              x.shape[2])
-                                       )
+                                              x.shape[2]),
+                                       dtype=np.float32)
         
         self.y_output_array = np.empty(shape = (output_shape),
-                                       dtype = np.object_)
+                                       dtype = self.labels.dtype)
         
         self.identifier_array = np.empty(shape = (output_shape),
-                                       dtype = np.object_)
+                                       dtype = '<U64')
+        
+        self._seed_originals_()
+    
+    def _seed_originals_(self) -> None:
+        """Copia los datos originales al inicio de los arreglos de salida, jitter y scaling solo escriben despues de ellos
+        """
+        self.x_output_array[:self.current, :, :] = self.eeg
+        
+        self.y_output_array[:self.current] = self.labels
+        
+        self.identifier_array[:self.current] = 'original'
     
     def jitter(self, low_sigma:float, high_sigma:float) -> Tuple:
         """Toddo acerca de Jitter: https://arxiv.org/pdf/1706.00527.pdf
@@ -66,36 +84,36 @@ class DataAugmentation:
             np.ndarray: 1D array de labels con los datos aumentados
             np.ndarray: 1D array de identificadores con los datos aumentados (Original, jitter__sigma_SigmaLevel__target_LabelName, ...)
         """
-        current = self.current
-                
-        sigmas = np.linspace(low_sigma, high_sigma, self.augmentation_factor)
+        num_epochs = self.current
         
-        type_augmented = ['jitter__sigma_{:.1e}'.format(sigma) for sigma in sigmas]
+        sigmas = np.linspace(low_sigma, high_sigma, self.augmentation_factor, dtype=np.float32)
         
-        keys = range(len(sigmas))
+        type_augmented = np.char.mod('jitter__sigma_%.1e', sigmas)
         
-        dict_identifier = dict(zip(keys, type_augmented))
+        """
+            noise.shape = (augmentation_factor, epochs, channels, time) un bloque de ruido por cada sigma
+            self.eeg[np.newaxis] se transmite sobre el eje de sigmas
+        """
+        noise = self._rng.standard_normal(size=(self.augmentation_factor, ) + self.eeg.shape,
+                                          dtype=np.float32)
         
-        self.x_output_array[:self.eeg.shape[0], :, :] = self.eeg
+        """
+            augmented es una vista de x_output_array con forma (augmentation_factor, epochs, channels, time),
+            numexpr evalua eeg + sigma * noise en una sola pasada y escribe directo en ella
+        """
+        augmented = self.x_output_array[num_epochs:].reshape(noise.shape)
         
-        self.y_output_array[:self.eeg.shape[0]] = self.labels
+        ne.evaluate("eeg + sigma * noise",
+                    local_dict={'eeg': self.eeg[np.newaxis],
+                                'sigma': sigmas[:, np.newaxis, np.newaxis, np.newaxis],
+                                'noise': noise},
+                    out=augmented)
         
-        self.identifier_array[:self.eeg.shape[0]] = ['original'] * self.eeg.shape[0]
+        self.y_output_array[num_epochs:] = np.tile(self.labels, self.augmentation_factor)
         
-        for index, sigma in enumerate(sigmas):
-            for array, target in zip(self.eeg, self.labels):
-                
-                temp_array = array + np.random.normal(loc = 0.,
-                                                      scale = sigma,
-                                                      size = array.shape)
-                
-                self.x_output_array[current, :, :]  = temp_array
-                
-                self.y_output_array[current] = target
-                
-                self.identifier_array[current] = f'{dict_identifier[index]}__target_{target}'
-                
-                current += 1
+        self.identifier_array[num_epochs:] = np.char.add(np.repeat(type_augmented, num_epochs),
+                                                         np.tile(self._target_suffix,
+                                                                 self.augmentation_factor))
         
         return self.x_output_array, self.y_output_array, self.identifier_array
     
@@ -113,41 +131,34 @@ class DataAugmentation:
             np.ndarray: 1D array de labels con los datos aumentados
             np.ndarray: 1D array de identificadores con los datos aumentados (Original, jitter_1, jitter_2, ...)
         """
-        current = self.current
-        
-        sigmas = np.linspace(low_sigma, high_sigma, num=self.augmentation_factor)
+        num_epochs = self.current
         
-        type_augmented = ['scaling__sigma_{:.1e}'.format(sigma) for sigma in sigmas]
+        sigmas = np.linspace(low_sigma, high_sigma, num=self.augmentation_factor, dtype=np.float32)
         
-        keys = range(len(sigmas))
+        type_augmented = np.char.mod('scaling__sigma_%.1e', sigmas)
         
-        dict_identifier = dict(zip(keys, type_augmented))
+        """
+            noise.shape = (augmentation_factor, epochs, 1, time) el mismo factor para todos los canales de una epoca
+        """
+        noise = self._rng.standard_normal(size=(self.augmentation_factor,
+                                                num_epochs,
+                                                1,
+                                                self.eeg.shape[2]),
+                                          dtype=np.float32)
         
-        self.x_output_array[:self.eeg.shape[0], :, :] = self.eeg
+        augmented = self.x_output_array[num_epochs:].reshape((self.augmentation_factor, ) + self.eeg.shape)
         
-        self.y_output_array[:self.eeg.shape[0]] = self.labels
+        ne.evaluate("eeg * (1 + sigma * noise)",
+                    local_dict={'eeg': self.eeg[np.newaxis],
+                                'sigma': sigmas[:, np.newaxis, np.newaxis, np.newaxis],
+                                'noise': noise},
+                    out=augmented)
         
-        self.identifier_array[:self.eeg.shape[0]] = ['original'] * self.eeg.shape[0]
+        self.y_output_array[num_epochs:] = np.tile(self.labels, self.augmentation_factor)
         
-        for index, sigma in enumerate(sigmas):
-            for array, target in zip(self.eeg, self.labels):
-                
-                array = np.expand_dims(array, axis=0)
-                
-                factor = np.random.normal(loc=1.,
-                                          scale=sigma,
-                                          size=(1,
-                                                self.eeg.shape[2])
-                                          )
-                
-                self.x_output_array[current, :, :]  = np.multiply(array,
-                                                                  factor[ :,np.newaxis,:])
-                
-                self.y_output_array[current] = target
-                                
-                self.identifier_array[current] = f'{dict_identifier[index]}__target_{target}'
-
-                current += 1
+        self.identifier_array[num_epochs:] = np.char.add(np.repeat(type_augmented, num_epochs),
+                                                         np.tile(self._target_suffix,
+                                                                 self.augmentation_factor))
                 
         return self.x_output_array, self.y_output_array, self.identifier_array
 
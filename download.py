@@ -1,9 +1,11 @@
 import os
-import glob 
 import shutil
 import tarfile
+import subprocess
 import requests
+from pathlib import Path
 from typing import Optional
+from requests.adapters import HTTPAdapter
 
 
 class Downloader:
@@ -11,12 +13,14 @@ class Downloader:
     """
     
     def __init__(self, url:Optional[str]="http://www.cs.toronto.edu/~complingweb/data/karaOne",
-                 download_path:Optional[str]='Data'):
+                 download_path:Optional[str]='Data',
+                 pool_maxsize:Optional[int]=10):
         """Constructor de la clase Downloader
 
         Args:
             url (Optional[str], optional): Url de donde estan los datasets de KaraOne. Defaults to "http://www.cs.toronto.edu/~complingweb/data/karaOne".
             download_path (Optional[str], optional): Path donde se guardaran los datos. Defaults to 'Data'.
+            pool_maxsize (Optional[int], optional): Conexiones que se mantienen abiertas para reutilizar, debe ser al menos el numero de descargas simultaneas. Defaults to 10.
 
         Raises:
             PermissionError: Si no se tiene permisos para crear el directorio o eliminar directorios.
@@ -24,6 +28,11 @@ class Downloader:
         
         self.url = url
         self.downlad_path = download_path
+        
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=pool_maxsize))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=pool_maxsize))
+        
         try:
             os.mkdir(download_path)
         
@@ -33,12 +42,12 @@ class Downloader:
         except PermissionError:
             raise PermissionError("Permission denied, exiting")
     
-    def _create_folder(self, folder:str):
+    def _create_folder(self, folder:str, reset:Optional[bool]=True):
         
         if not os.path.exists(folder):
             
             try:
-                os.mkdir(folder)
+                os.makedirs(folder, exist_ok=True)
                 
             except PermissionError:
                 raise PermissionError("Permission denied, exiting")
@@ -46,6 +55,9 @@ class Downloader:
             else:
                 return True
         
+        elif not reset:
+            return True
+        
         else:
             try:
                 shutil.rmtree(folder)
@@ -57,36 +69,43 @@ class Downloader:
                 os.mkdir(folder)
                 return True
             
-    def downlad(self, subject:str, output_path:Optional[str]='RawDataCompressed'):
+    def downlad(self, subject:str, output_path:Optional[str]='RawDataCompressed') -> bool:
         """Metodo para descargar los archivos de KaraOne
 
         Args:
             subject (str): Sujeto a descargar, nombrado como en KaraOne
             output_path (Optional[str], optional): Folder donde se descargaran los daros. Defaults to 'RawDataCompressed'.
+
+        Returns:
+            bool: Verdadero si el sujeto se descargo, falso si la url no es valida
         """
         
         output_path = os.path.join(self.downlad_path, output_path)
         
-        if self._create_folder(output_path):
+        if self._create_folder(output_path, reset=False):
             
             try:
                 
                 print(f"Downloading {subject}")
                  
-                with requests.get(f"{self.url}/{subject}.tar.bz2",
-                                stream=True, allow_redirects=True) as response:
+                with self.session.get(f"{self.url}/{subject}.tar.bz2",
+                                      stream=True, allow_redirects=True) as response:
                     
                     response.raise_for_status()
-                    for chunk in response.iter_content(chunk_size=2048):
-                        open(os.path.join(output_path, f"{subject}.tar.bz2"), "ab").write(chunk)
                     
-                response.close()
+                    with open(os.path.join(output_path, f"{subject}.tar.bz2"), "wb") as file:
+                        for chunk in response.iter_content(chunk_size=1024 * 1024):
+                            file.write(chunk)
             
             except requests.exceptions.HTTPError:
                 print(f"Invalid URL: {self.url}{subject}.tar.bz2 maybe the subject {subject} is not available or dosn't exist")
+                
+                return False
             
             else:
                 print(f"Downloaded {subject}")
+                
+                return True
     
     def extract(self, subject:str, src_folder:Optional[str]='RawDataCompressed',
                 dst_folder:Optional[str]='RawDataExtracted'):
@@ -107,55 +126,75 @@ class Downloader:
         
         src_path = os.path.join(self.downlad_path, src_folder, f"{subject}.tar.bz2")
         
-        create = self._create_folder(output_path)
+        create = self._create_folder(os.path.join(output_path, subject))
         
         if create and os.path.exists(src_path):
             
             print(f"Extracting {subject}")
             
             try:
-                with tarfile.open(src_path) as tar:
-                    def is_within_directory(directory, target):
+                pbzip2 = shutil.which("pbzip2")
+                
+                if pbzip2 and shutil.which("tar"):
+                    """
+                        pbzip2 descomprime el bz2 en varios nucleos, tar no extrae miembros con '..'
+                    """
+                    subprocess.run(["tar", f"--use-compress-program={pbzip2}",
+                                    "-xf", src_path,
+                                    "-C", os.path.join(output_path, subject)],
+                                   check=True)
+                
+                else:
+                    with tarfile.open(src_path) as tar:
+                        def is_within_directory(directory, target):
                         
-                        abs_directory = os.path.abspath(directory)
-                        abs_target = os.path.abspath(target)
+                            abs_directory = os.path.abspath(directory)
+                            abs_target = os.path.abspath(target)
                     
-                        prefix = os.path.commonprefix([abs_directory, abs_target])
+                            prefix = os.path.commonprefix([abs_directory, abs_target])
                         
-                        return prefix == abs_directory
+                            return prefix == abs_directory
                     
-                    def safe_extract(tar, path=".", members=None, *, numeric_owner=False):
+                        def safe_extract(tar, path=".", members=None, *, numeric_owner=False):
                     
-                        for member in tar.getmembers():
-                            member_path = os.path.join(path, member.name)
-                            if not is_within_directory(path, member_path):
-                                raise Exception("Attempted Path Traversal in Tar File")
+                            for member in tar.getmembers():
+                                member_path = os.path.join(path, member.name)
+                                if not is_within_directory(path, member_path):
+                                    raise Exception("Attempted Path Traversal in Tar File")
                     
-                        tar.extractall(path, members, numeric_owner=numeric_owner) 
+                            tar.extractall(path, members, numeric_owner=numeric_owner) 
                         
                     
-                    safe_extract(tar, os.path.join(output_path,subject))
+                        safe_extract(tar, os.path.join(output_path,subject))
                     
-                tar.close()
+                    tar.close()
                 
                 print(f"Done extracting {subject}")
             
             except tarfile.ReadError:
                 raise tarfile.ReadError(f"Invalid tar file: {subject}.tar.bz2")
             
+            except subprocess.CalledProcessError:
+                raise tarfile.ReadError(f"Invalid tar file: {subject}.tar.bz2")
+            
             except FileNotFoundError:
                 raise FileNotFoundError("File not found, exiting")
             
             else:
                 
-                folders = [folder[0] for folder in os.walk(os.path.join(output_path,
-                                                                        subject)) if len(folder[2])]
+                subject_path = Path(output_path, subject)
                 
-                root_folders = list(filter(lambda folder: folder.split("\\")[-1] == subject, folders))
+                """
+                    El tar guarda los archivos en una carpeta anidada con el nombre del sujeto,
+                    se buscan ahi y se suben a subject_path con un rename por archivo
+                """
+                root_folder = next((folder for folder in subject_path.rglob(subject)
+                                    if folder.is_dir() and any(file.is_file() for file in folder.iterdir())),
+                                   None)
                 
-                files = glob.glob(os.path.join(root_folders[0], "*"))
+                files = list(root_folder.iterdir()) if root_folder is not None else []
                 
-                movefiles = lambda file: shutil.move(file, os.path.join(output_path, subject))
+                movefiles = lambda file: os.replace(file, subject_path / file.name)
                 
                 try:
                     print("Moving files...")
@@ -0,0 +1,101 @@
+import os
+import multiprocessing
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from .download import Downloader
+from .split import SplitData
+
+
+def _process_one_(subject:str, root_folder:str, type_action:str, duration_time:int) -> None:
+    """Extrae y divide un sujeto ya descargado, se ejecuta en un proceso aparte
+
+    Args:
+        subject (str): Sujeto a procesar, nombrado como en KaraOne
+        root_folder (str): Folder donde estan las carpetas
+        type_action (str): Accion que buscamos de los sujetos de KaraOne
+        duration_time (int): Tiempo de duracion de la accion
+    """
+    Downloader(download_path=root_folder).extract(subject)
+    
+    SplitData(subject=subject,
+              type_action=type_action,
+              root_folder=root_folder).split(duration_time=duration_time, save=True)
+
+
+def run_pipeline(subjects:List[str],
+                 n_workers:Optional[int]=2,
+                 max_downloads:Optional[int]=4,
+                 root_folder:Optional[str]='Data',
+                 type_action:Optional[str]='thinking_inds',
+                 duration_time:Optional[int]=4500) -> List[str]:
+    """Descarga, extrae y divide varios sujetos de KaraOne en paralelo.
+    
+    Las descargas corren en hilos y la extraccion y division en procesos, cada sujeto
+    empieza a procesarse en cuanto termina su descarga. Si un sujeto falla se reporta
+    el error y se continua con los demas.
+
+    Args:
+        subjects (List[str]): Sujetos a procesar, nombrados como en KaraOne
+        n_workers (Optional[int], optional): Procesos para extraer y dividir, cada proceso carga el CNT completo
+            de un sujeto en memoria (varios GB), subirlo solo si hay RAM suficiente. Defaults to 2.
+        max_downloads (Optional[int], optional): Descargas simultaneas. Defaults to 4.
+        root_folder (Optional[str], optional): Folder donde se guardaran las carpetas. Defaults to 'Data'.
+        type_action (Optional[str], optional): Accion que buscamos de los sujetos de KaraOne. Defaults to 'thinking_inds'.
+        duration_time (Optional[int], optional): Tiempo de duracion de la accion. Defaults to 4500.
+
+    Returns:
+        List[str]: Sujetos que fueron procesados correctamente, los que fallaron no se incluyen
+    """
+    
+    downloader = Downloader(download_path=root_folder, pool_maxsize=max_downloads)
+    
+    os.makedirs(os.path.join(root_folder, 'SplittedData'), exist_ok=True)
+    
+    """
+        Los procesos se crean con spawn, con fork se copiarian los locks que tienen tomados
+        los hilos de descarga (session, ssl, print) y el proceso hijo podria quedarse bloqueado
+    """
+    
+    processed = []
+    
+    with ThreadPoolExecutor(max_workers=max_downloads) as download_pool, \
+         ProcessPoolExecutor(max_workers=n_workers,
+                             mp_context=multiprocessing.get_context("spawn")) as process_pool:
+        
+        downloads = {download_pool.submit(downloader.downlad, subject): subject for subject in subjects}
+        
+        jobs = {}
+        
+        for download in as_completed(downloads):
+            
+            subject = downloads[download]
+            
+            try:
+                downloaded = download.result()
+            
+            except Exception as error:
+                print(f"Download failed for {subject}: {error!r}, skipping")
+                continue
+            
+            if not downloaded:
+                print(f"Download failed for {subject}, skipping")
+                continue
+            
+            jobs[process_pool.submit(_process_one_, subject, root_folder,
+                                     type_action, duration_time)] = subject
+        
+        for job in as_completed(jobs):
+            
+            subject = jobs[job]
+            
+            try:
+                job.result()
+            
+            except Exception as error:
+                print(f"Processing failed for {subject}: {error!r}, skipping")
+            
+            else:
+                processed.append(subject)
+    
+    return processed
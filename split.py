@@ -43,6 +43,8 @@ class SplitData:
         
         self.output_file = os.path.join(self.output_path, f"{subject}.npz")
         
+        self.eeg_file = os.path.join(self.output_path, f"{subject}_EEG.npy")
+        
         if type_action not in ['clearing_inds', 'thinking_inds']:
             raise ValueError(f"type_action {type_action} not supported on this dataset")
 
@@ -89,6 +91,17 @@ class SplitData:
             
         except FileNotFoundError:
             raise FileNotFoundError(f"{self.subject_path}/epoch_inds.mat not found")
+        
+        else:
+            """
+                epochs_index[type].shape = 1, 165 1 columna de 165 epocas
+                self.epochs_index[self.type_target][0][word_index].shape = (1,2) Me supongo hace referencia a inicio y fin del pensamiento
+            """
+            epochs = self.epochs_index[self.type_target][0]
+            
+            self._start_epochs = np.array([epoch[0, 0] for epoch in epochs], dtype=np.intp)
+            
+            self._end_epochs = np.array([epoch[0, 1] for epoch in epochs], dtype=np.intp)
     
     def _load_targets_(self):
         """Carga las palabras de los epochs
@@ -103,7 +116,11 @@ class SplitData:
             raise FileNotFoundError(f"{self.subject_path}/all_features_simple.mat not found")
         
         else:
-            self.targets = targets['all_features'][0, 0]["prompts"][0]
+            """
+                prompts[0] es un arreglo de celdas de matlab, cada una un arreglo con la palabra,
+                se guardan como arreglo de texto para no depender de pickle al cargar el npz
+            """
+            self.targets = np.array([str(np.squeeze(prompt)) for prompt in targets['all_features'][0, 0]["prompts"][0]])
     
     def _load_raw_(self):
         """Carga el archivo raw de la data
@@ -135,7 +152,7 @@ class SplitData:
 
         Args:
             duration_time (Optional[int], optional): Tiempo de duracion de la accion. Defaults to 4500.
-            save (Optional[bool], optional): Guardar los datos crudos en un archivo npz. Defaults to False.
+            save (Optional[bool], optional): Guardar el EEG en un archivo npy y los targets en un archivo npz. Defaults to False.
 
         Raises:
             ValueError: Si el tiempo de duracion es menor a cero o mayor a 5000
@@ -147,45 +164,37 @@ class SplitData:
         
         print('Making dataset')
         
-        EEG = np.zeros(shape=(len(self.targets), len(self.raw.ch_names),  duration_time))
+        if duration_time > 5000 or duration_time <= 0:
+            raise ValueError(f"duration_time must be less than 5000")
         
         offset = int(self.raw.info["sfreq"]/2)
-    
-        for word_index, _ in enumerate(self.targets):
-            
-            """
-            epochs_index[type].shape = 1, 165 1 columna de 165 epocas
-            epochs_index[type][word_index][0].shape = 165 que son los trail totales del sujeto
-            self.epochs_index[self.type_target][0][word_index].shape = (1,2) Me supongo hace referencia a inicio y fin del pensamiento
-            end_epoch = self.epochs_index[self.type_target][0][word_index][0][1] Por el momento no utilizare esta ya que no me da 5 segundos exactos
-            """
-            
-            start_epoch = self.epochs_index[self.type_target][0][word_index][0][0] + offset
-            
-            if duration_time == 5000:
-                end_epoch = self.epochs_index[self.type_target][0][word_index][0][1] + offset
-            
-            elif duration_time < 5000 and duration_time > 0:
-                end_epoch = start_epoch + duration_time
-            
-            else:
-                
-                raise ValueError(f"duration_time must be less than 5000")
-            
-            for channel_index, _ in enumerate(self.raw.ch_names):
-                """
-                    len(self.raw[channel_index]) = 2 Data, time
-                    self.raw[channel_index][0].shape = 1,2477400 Un trail de 2477400 muestras
-                    self.raw[channel_index][1].shape = 2477400 Tiempo en ms de toda la muestra  
-                    self.raw[channel_index][0][0] = todas las muestras de el trail
-                    self.raw[channel_index][0][0][start_epoch:end_epoch].shape = 5000 muestras por epoca
-                """
-                EEG[word_index, channel_index, 0:end_epoch - start_epoch] = self.raw[channel_index][0][0][start_epoch:end_epoch]
+        
+        start_epochs = self._start_epochs[:len(self.targets)] + offset
+        
+        if duration_time == 5000:
+            end_epochs = self._end_epochs[:len(self.targets)] + offset
+        
+        else:
+            end_epochs = start_epochs + duration_time
+        
+        EEG = np.zeros(shape=(len(self.targets), len(self.raw.ch_names),  duration_time),
+                       dtype=np.float32)
+        
+        """
+            Cada epoca se lee de raw para todos los canales y se copia directo en EEG (float32, el cast se hace en la copia),
+            no se copia la grabacion completa con get_data() para solo cortar las epocas
+            self.raw.get_data(start=start_epoch, stop=end_epoch).shape = (channels, end_epoch - start_epoch)
+        """
+        for word_index, (start_epoch, end_epoch) in enumerate(zip(start_epochs, end_epochs)):
+            EEG[word_index, :, 0:end_epoch - start_epoch] = self.raw.get_data(start=start_epoch,
+                                                                               stop=end_epoch)
                 
         if save:
-            np.savez(self.output_file, EEG=EEG, targets=self.targets)
+            np.save(self.eeg_file, EEG)
+            
+            np.savez(self.output_file, targets=self.targets)
             
-            print(f"Dataset saved to {self.output_file}")
+            print(f"Dataset saved to {self.eeg_file} and {self.output_file}")
             print(f"with shape {EEG.shape}, and {len(self.targets)} targets")
         
             del EEG
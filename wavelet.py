@@ -5,8 +5,47 @@ import dtcwt
 import warnings
 import numpy as np
 from typing import Optional, Tuple
-from pyts.preprocessing import RobustScaler
-from pyts.multivariate.transformation import MultivariateTransformer
+from joblib import Parallel, delayed, effective_n_jobs
+
+
+"""
+    Transform1d carga los filtros biort y qshift al construirse, se crea una sola vez por proceso
+"""
+_TRANSFORM = dtcwt.Transform1d()
+
+"""
+    Trails que se transforman por llamada cuando n_jobs == 1, asi un EEG mapeado en memoria
+    se lee por bloques en lugar de copiarse completo a RAM
+"""
+_BLOCK_TRAILS = 16
+
+
+def _highpass_(eeg:np.ndarray, desc_level:int) -> np.ndarray:
+    """Aplica la DTCWT a un bloque de trails y retorna la magnitud del highpass del ultimo nivel
+
+    Args:
+        eeg (np.ndarray): EEG array de 3 dimensiones (trails, channels, time)
+        desc_level (int): Nivel de descomposición de la transformada de wavelet
+
+    Returns:
+        np.ndarray: 3D array (trails, channels, time) con la magnitud del highpass
+    """
+    num_trails, num_channels, num_samples = eeg.shape
+    
+    """
+        signals.shape = (samples, trails * channels) cada columna es una señal independiente,
+        dtcwt transforma todas las columnas en una sola llamada
+    """
+    signals = np.asarray(eeg).transpose(2, 0, 1).reshape(num_samples,
+                                                         num_trails * num_channels)
+    
+    wavelet = _TRANSFORM.forward(signals, nlevels=desc_level)
+    
+    highpass = np.abs(wavelet.highpasses[desc_level - 1])
+    
+    return highpass.reshape(-1,
+                            num_trails,
+                            num_channels).transpose(1, 2, 0).astype(np.float32)
 
 
 class Wavelet:
@@ -34,6 +73,8 @@ class Wavelet:
         
         self.data_file = os.path.join(self.working_folder, f"{subject}.npz")
         
+        self.eeg_file = os.path.join(self.working_folder, f"{subject}_EEG.npy")
+        
         self.output_folder = os.path.join(root_folder, dst_folder)
         
         self.output_file = os.path.join(self.output_folder, f"{subject}_wavlet_{desc_level}.npz")
@@ -67,17 +108,33 @@ class Wavelet:
     def _load_data_(self) -> None:
         """Carga los datos de EEG, los targets y los identificadores si existen
         Raises:
+            FileNotFoundError: Si no hay EEG en el npz ni archivo npy del EEG
+            ValueError: Si los targets fueron guardados como objetos (npz de versiones anteriores de SplitData)
             ValueError: Si el EEG no tiene el formato correcto
         """
         
         print('Loading data...')
         
-        data = np.load(self.data_file,
-                       allow_pickle=True,
-                       mmap_mode="r")
+        data = np.load(self.data_file)
+        
+        """
+            Si el npz trae su propio EEG (por ejemplo datos aumentados) se usa ese,
+            si no, se mapea en memoria el npy que guarda SplitData en lugar de leerlo completo
+        """
+        if 'EEG' in data.files:
+            self.EEG = data['EEG']
         
-        self.EEG = data['EEG']
-        self.targets = data['targets']
+        elif os.path.exists(self.eeg_file):
+            self.EEG = np.load(self.eeg_file, mmap_mode="r")
+        
+        else:
+            raise FileNotFoundError(f"{self.data_file} has no EEG and {self.eeg_file} not found")
+        
+        try:
+            self.targets = data['targets']
+        
+        except ValueError:
+            raise ValueError(f"{self.data_file} has object targets, regenerate it with SplitData")
         
         try:
             self.identifiers = data["identifier"]
@@ -88,53 +145,54 @@ class Wavelet:
             raise ValueError(f"{self.data} is not a 3D array")
     
     def apply(self, scale:Optional[bool]=True,
-              save:Optional[bool]=True) -> Tuple:
+              save:Optional[bool]=True,
+              n_jobs:Optional[int]=1) -> Tuple:
         """Funcion encargada de aplicar la transformada de wavelet a los datos
 
         Args:
             scale (Optional[bool], optional): Si es verdadera aplicara un robust scaler despues de aplicar la transformada de wavelet. Defaults to True.
             save (Optional[bool], optional): Si es verdadera, guardara los datos y no retornara nada. Defaults to True.
+            n_jobs (Optional[int], optional): Procesos para dividir los trails en bloques, -1 usa todos los nucleos. Defaults to 1.
 
         Returns:
             Tuple: Retornara los datos transformados y los targets si save es falsa
         """
         
-        def _calc_shape_(num_samples:int, times:int):
-            
-            print(f"Calculating new shape for {num_samples} samples and {times} times")
-            
-            for _ in range(times):
-                
-                num_samples = math.ceil(num_samples / 2)
-            
-            return int(num_samples)
-
-        print('Applying wavelet transform...')
-        
-        num_trails = self.EEG.shape[0]
-        num_channels = self.EEG.shape[1]
-        num_samples = self.EEG.shape[2]
-        
-        resampling_sahpe = _calc_shape_(num_samples, self.desc_level)
-        
-        self.wavelet_array = np.zeros(shape=(num_trails, num_channels, resampling_sahpe))
-        
         print('Applying wavelet transform...')
         
-        transform = dtcwt.Transform1d()
+        if n_jobs == 1:
+            blocks = np.array_split(self.EEG, math.ceil(self.EEG.shape[0] / _BLOCK_TRAILS))
+            
+            results = [_highpass_(block, self.desc_level) for block in blocks]
+            
+            self.wavelet_array = np.concatenate(results, axis=0)
         
-        for index, trail in enumerate(self.EEG):
+        else:
+            """
+                Se divide el EEG en un bloque de trails por proceso, cada bloque se transforma en una sola llamada
+            """
+            blocks = np.array_split(self.EEG, min(effective_n_jobs(n_jobs), self.EEG.shape[0]))
             
-            wavelet = transform.forward(trail.T, nlevels=self.desc_level)
+            results = Parallel(n_jobs=n_jobs)(delayed(_highpass_)(block, self.desc_level)
+                                              for block in blocks)
             
-            self.wavelet_array[index] = np.abs(wavelet.highpasses[self.desc_level - 1].T)
+            self.wavelet_array = np.concatenate(results, axis=0)
         
         if scale:
-             
-            scaler = MultivariateTransformer(RobustScaler(),
-                                             flatten = False)
-
-            self.wavelet_array = scaler.fit_transform(self.wavelet_array)
+            """
+                Robust scaler por trail y canal sobre el eje del tiempo: (x - mediana) / IQR
+            """
+            median = np.median(self.wavelet_array, axis=-1, keepdims=True)
+            
+            q1, q3 = np.percentile(self.wavelet_array, [25, 75], axis=-1, keepdims=True)
+            
+            iqr = q3 - q1
+            
+            iqr[iqr == 0] = 1
+            
+            self.wavelet_array -= median
+            
+            self.wavelet_array /= iqr
         
         if save:
             